@@ -164,6 +164,9 @@ def create_app():
 
 
 if __name__ == "__main__":
+    import logging
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     app = create_app()
     app.run(debug=False)
     #app.run(host="127.0.0.1", port=5000, debug=True)
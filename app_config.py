@@ -15,12 +15,32 @@ ENV_PATH = ROOT_DIR / ".env"
 
 EMBED_MODEL_NAME = "abhinand/MedEmbed-base-v0.1"  # or -large
 EMBEDDING_DIM = 768
+# Nodes per forward pass through the embedder; raise on GPU, lower if CPU
+# inference starts swapping.
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
 
 PINECONE_INDEX_NAME = "sqbot-data-index"
 PINECONE_CLOUD = "aws"
 PINECONE_REGION = "us-east-1"
 PINECONE_NAMESPACE = None
 
+# Size of the urllib3 pool behind each Index handle; reused keep-alive
+# connections skip the TLS handshake on every data-plane call.
+PINECONE_POOL_THREADS = int(os.getenv("PINECONE_POOL_THREADS", "16"))
+
+# Client and index handles cached for the process lifetime so repeated calls
+# reuse the HTTP connection pool and skip the list_indexes() round-trip
+# (indexes don't appear out of thin air).
+_pc_client = None
+_index_cache: dict = {}
+
+
+def _get_pinecone_client(api_key: str) -> Pinecone:
+    global _pc_client
+    if _pc_client is None:
+        _pc_client = Pinecone(api_key=api_key)
+    return _pc_client
+
 
 def upsert_prime_nodes(pinecone_index) -> None:
     """
@@ -54,6 +74,7 @@ def init_settings_and_storage():
     Settings.embed_model = HuggingFaceEmbedding(
         model_name=EMBED_MODEL_NAME,
         device="cpu",  # or "cuda"
+        embed_batch_size=EMBED_BATCH_SIZE,
     )
 
     Settings.node_parser = SentenceSplitter(
@@ -61,30 +82,32 @@ def init_settings_and_storage():
         chunk_overlap=30,
     )
 
-    pc = Pinecone(api_key=pinecone_api_key)
-    existing_indexes = pc.list_indexes().names()
-
-    if PINECONE_INDEX_NAME not in existing_indexes:
-        print(f"Creating Pinecone index '{PINECONE_INDEX_NAME}'...")
-        pc.create_index(
-            name=PINECONE_INDEX_NAME,
-            dimension=EMBEDDING_DIM,
-            metric="cosine",
-            spec=ServerlessSpec(
-                cloud=PINECONE_CLOUD,
-                region=PINECONE_REGION,
-            ),
-        )
-
-        pinecone_index = pc.Index(PINECONE_INDEX_NAME)
-        upsert_prime_nodes(pinecone_index)
-        print("Prime nodes inserted (Pharma + Herbal + Agrovet).")
-
-    else:
-        print(f"Using existing Pinecone index '{PINECONE_INDEX_NAME}'")
-        pinecone_index = pc.Index(PINECONE_INDEX_NAME)
-
-    pinecone_index = pc.Index(PINECONE_INDEX_NAME)
+    pinecone_index = _index_cache.get(PINECONE_INDEX_NAME)
+    if pinecone_index is None:
+        pc = _get_pinecone_client(pinecone_api_key)
+        existing_indexes = set(pc.list_indexes().names())
+
+        if PINECONE_INDEX_NAME not in existing_indexes:
+            print(f"Creating Pinecone index '{PINECONE_INDEX_NAME}'...")
+            pc.create_index(
+                name=PINECONE_INDEX_NAME,
+                dimension=EMBEDDING_DIM,
+                metric="cosine",
+                spec=ServerlessSpec(
+                    cloud=PINECONE_CLOUD,
+                    region=PINECONE_REGION,
+                ),
+            )
+
+            pinecone_index = pc.Index(PINECONE_INDEX_NAME, pool_threads=PINECONE_POOL_THREADS)
+            upsert_prime_nodes(pinecone_index)
+            print("Prime nodes inserted (Pharma + Herbal + Agrovet).")
+
+        else:
+            print(f"Using existing Pinecone index '{PINECONE_INDEX_NAME}'")
+            pinecone_index = pc.Index(PINECONE_INDEX_NAME, pool_threads=PINECONE_POOL_THREADS)
+
+        _index_cache[PINECONE_INDEX_NAME] = pinecone_index
 
     vector_store = PineconeVectorStore(
         pinecone_index=pinecone_index,
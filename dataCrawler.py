@@ -1,7 +1,10 @@
+import os
+import queue
 import re
 import subprocess
 import sys
 import json
+import threading
 import time
 import unicodedata
 from pathlib import Path
@@ -9,7 +12,12 @@ from urllib.parse import urljoin, urlparse, unquote
 
 import requests
 from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception_type
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from upsert import build_index
 
@@ -36,11 +44,24 @@ DATA_DIR = ROOT_DIR / "data"
 
 JSON_DIR = ROOT_DIR / "save"
 OUT_JSON = JSON_DIR / "product_pdf_map.json"
+# Append-only log of original PDF filenames already recorded; one line per
+# key, flushed immediately, so debounced state writes can't lose dedup info.
+SEEN_LOG = JSON_DIR / "seen_pdfs.log"
 
 REQUEST_TIMEOUT = 30
-SLEEP_SECONDS = 1
+# Minimum spacing between requests on one connection; parse/write time counts
+# toward the interval, so the crawler only sleeps for whatever is left of it.
+MIN_REQUEST_INTERVAL = float(os.getenv("CRAWL_MIN_INTERVAL", "1.0"))
 UA = "Mozilla/5.0 (compatible; SquarePharmaPDFDownloader/1.2)"
 
+# Persist state at most once per interval (final save is always forced)
+STATE_WRITE_INTERVAL = 5.0
+_last_state_write = 0.0
+_state_lock = threading.Lock()
+
+# Max queued downloads waiting for the download thread
+DOWNLOAD_QUEUE_SIZE = 8
+
 
 # -----------------------
 # HELPERS
@@ -131,26 +152,82 @@ def pdf_basename_from_url(pdf_url: str) -> str:
     return name or "unknown.pdf"
 
 
-def load_state() -> dict:
-    if OUT_JSON.exists():
-        try:
-            with open(OUT_JSON, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if not isinstance(data, dict):
-                return {"items": [], "failures": []}
-            data.setdefault("items", [])
-            data.setdefault("failures", [])
-            return data
-        except Exception:
-            return {"items": [], "failures": []}
-    return {"items": [], "failures": []}
+def _dumps_bytes(obj) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when available, stdlib otherwise)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
 
 
-def save_state(state: dict) -> None:
-    JSON_DIR.mkdir(parents=True, exist_ok=True)
-    state["count"] = len(state.get("items", []))
-    with open(OUT_JSON, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
+def _loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_state() -> dict:
+    # EAFP: open directly instead of exists()+open (one syscall, no TOCTOU race);
+    # a missing or corrupted file both fall back to a fresh state.
+    try:
+        with open(OUT_JSON, "rb") as f:
+            data = _loads(f.read())
+        if not isinstance(data, dict):
+            return {"items": [], "failures": []}
+        # setdefault would allocate a fresh default list even when the key
+        # exists (the common case); only build one when actually missing.
+        if "items" not in data:
+            data["items"] = []
+        if "failures" not in data:
+            data["failures"] = []
+        return data
+    except Exception:
+        return {"items": [], "failures": []}
+
+
+def save_state(state: dict, force: bool = False) -> None:
+    """Write state atomically (tmp + os.replace), debounced to one write per interval."""
+    global _last_state_write
+
+    with _state_lock:
+        now = time.monotonic()
+        if not force and (now - _last_state_write) < STATE_WRITE_INTERVAL:
+            return
+
+        JSON_DIR.mkdir(parents=True, exist_ok=True)
+        state["count"] = len(state.get("items", []))
+
+        tmp = OUT_JSON.with_name(OUT_JSON.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_dumps_bytes(state))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, OUT_JSON)
+
+        _last_state_write = now
+
+
+def load_seen_log() -> set:
+    """Read back the keys appended by append_seen().
+
+    One read + one decode + splitlines: C-level all the way, instead of a
+    Python-level strip/decode per line.
+    """
+    try:
+        with open(SEEN_LOG, "rb") as f:
+            raw = f.read()
+    except Exception:
+        return set()
+    keys = set(raw.decode("utf-8", errors="replace").splitlines())
+    keys.discard("")
+    return keys
+
+
+def append_seen(key: str) -> None:
+    """Record one key durably: O(1) appended bytes vs rewriting the whole state."""
+    with open(SEEN_LOG, "ab") as f:
+        f.write(key.encode("utf-8") + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
 
 
 def type_pdf_dir(prod_type: str) -> Path:
@@ -161,32 +238,50 @@ def type_pdf_dir(prod_type: str) -> Path:
 # -----------------------
 # NETWORK
 # -----------------------
+class RateLimiter:
+    """Enforce a minimum interval between requests without over-sleeping."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+# One retry policy for every network call. Jittered backoff desynchronizes
+# the crawl and download threads after a shared outage instead of having
+# both retry the host on the same schedule.
+_RETRY_KW = dict(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential_jitter(initial=1, max=12),
+    retry=retry_if_exception_type((requests.RequestException,)),
+    reraise=True,
+)
+
+
 class Client:
     def __init__(self):
         self.s = requests.Session()
         self.s.headers.update({"User-Agent": UA})
+        self.limiter = RateLimiter(MIN_REQUEST_INTERVAL)
 
-    def sleep(self):
-        time.sleep(SLEEP_SECONDS)
-
-    @retry(
-        stop=stop_after_attempt(4),
-        wait=wait_exponential(multiplier=1, min=1, max=12),
-        retry=retry_if_exception_type((requests.RequestException,)),
-        reraise=True,
-    )
+    @retry(**_RETRY_KW)
     def fetch_html(self, url: str) -> str:
+        self.limiter.wait()
         r = self.s.get(url, timeout=REQUEST_TIMEOUT)
         r.raise_for_status()
         return r.text
 
-    @retry(
-        stop=stop_after_attempt(4),
-        wait=wait_exponential(multiplier=1, min=1, max=12),
-        retry=retry_if_exception_type((requests.RequestException,)),
-        reraise=True,
-    )
+    @retry(**_RETRY_KW)
     def download_file(self, url: str, out_path: Path) -> None:
+        self.limiter.wait()
         out_path.parent.mkdir(parents=True, exist_ok=True)
         with self.s.get(url, timeout=REQUEST_TIMEOUT, stream=True) as r:
             r.raise_for_status()
@@ -196,6 +291,37 @@ class Client:
                         f.write(chunk)
 
 
+def _download_worker(dl_q: "queue.Queue", state: dict, failures: list) -> None:
+    """Consume (record, label) items and download PDFs while the main thread keeps crawling.
+
+    Uses its own Client/session; requests.Session is not guaranteed thread-safe.
+    """
+    c = Client()
+    while True:
+        item = dl_q.get()
+        try:
+            if item is None:
+                return
+            record, label = item
+            try:
+                c.download_file(record["pdf_url"], Path(record["saved_path"]))
+                record["downloaded"] = True
+                save_state(state)
+                print(f"{label} DOWNLOADED: {record['product_name']} -> {record['renamed_pdf_filename']} "
+                      f"(orig: {record['original_pdf_filename']})")
+            except Exception as e:
+                failures.append({
+                    "stage": "download",
+                    "type": record.get("type"),
+                    "url": record.get("pdf_url"),
+                    "error": str(e),
+                })
+                save_state(state)
+                print(f"{label} download failed: {record.get('pdf_url')} :: {e}")
+        finally:
+            dl_q.task_done()
+
+
 # -----------------------
 # MAIN
 # -----------------------
@@ -219,100 +345,107 @@ def dataCrawler(run_types: list[str] = RUN_TYPES):
         op = (it.get("original_pdf_filename") or "").strip()
         if op:
             seen_original_pdfs.add(op.lower())
+    # Union with the append-only log: covers records whose debounced state
+    # write never hit disk (e.g. a crash between saves).
+    seen_original_pdfs |= load_seen_log()
 
     print(f"Loaded {len(items)} existing records.")
     print(f"Seen original PDF filenames: {len(seen_original_pdfs)}")
     print(f"Run types: {run_types}")
 
-    new_downloads = 0
     total_pages = 0
 
-    for prod_type in run_types:
-        all_product_urls = set()
-        for ch in CHAR_BUCKETS:
-            url = listing_url(prod_type, ch)
-            try:
-                html = c.fetch_html(url)
-                urls = extract_product_links(url, html)
-                all_product_urls.update(urls)
-                print(f"[{prod_type.upper()} {ch}] products: {len(urls)}")
-            except Exception as e:
-                failures.append({"stage": "listing", "type": prod_type, "url": url, "error": str(e)})
-                print(f"[{prod_type.upper()} {ch}] listing failed: {e}")
-            finally:
-                c.sleep()
-                time.sleep(2)
-
-        all_product_urls = sorted(all_product_urls)
-        total_pages += len(all_product_urls)
-        print(f"\n[{prod_type.upper()}] Total product pages collected: {len(all_product_urls)}")
-
-        # Type-specific destination folder
-        dest_dir = type_pdf_dir(prod_type)
-
-        for i, purl in enumerate(all_product_urls, start=1):
-            try:
-                html = c.fetch_html(purl)
-                soup = BeautifulSoup(html, "lxml")
-
-                product_name = extract_product_name(soup)
-                if not product_name:
-                    raise ValueError("Missing product name (h1.pdetails)")
-
-                pdf_url = extract_prescribing_pdf_url(purl, soup)
-                if not pdf_url:
-                    continue
-
-                original_pdf_filename = pdf_basename_from_url(pdf_url)
-                if not original_pdf_filename:
-                    continue
-
-                key = original_pdf_filename.lower()
-                if key in seen_original_pdfs:
-                    print(f"[{prod_type} {i}/{len(all_product_urls)}] SKIP (already in JSON): {product_name} -> {original_pdf_filename}")
-                    continue
-
-                safe_product = sanitize_windows_filename(product_name)
-                desired_name = f"{safe_product}.pdf"
-                out_path = unique_path(dest_dir / desired_name)
-
-                record = {
-                    "type": prod_type,
-                    "product_name": product_name,
-                    "product_url": purl,
-                    "pdf_url": pdf_url,
-                    "original_pdf_filename": original_pdf_filename,
-                    "renamed_pdf_filename": out_path.name,
-                    "downloaded": False,
-                    "saved_path": str(out_path),  # optional but useful
-                }
-
-                # Save JSON BEFORE download
-                items.append(record)
-                seen_original_pdfs.add(key)
-                state["items"] = items
-                state["failures"] = failures
-                save_state(state)
-
-                c.download_file(pdf_url, out_path)
-                record["downloaded"] = True
-                save_state(state)
-
-                new_downloads += 1
-                print(f"[{prod_type} {i}/{len(all_product_urls)}] DOWNLOADED: {product_name} -> {out_path.name} (orig: {original_pdf_filename})")
-
-            except Exception as e:
-                failures.append({"stage": "product", "type": prod_type, "url": purl, "error": str(e)})
-                state["failures"] = failures
-                save_state(state)
-                print(f"[{prod_type} {i}/{len(all_product_urls)}] product failed: {purl} :: {e}")
-            finally:
-                c.sleep()
-                time.sleep(2)
-
-    state["items"] = items
-    state["failures"] = failures
-    save_state(state)
+    # Downloads run on a dedicated thread so PDF transfers overlap the
+    # listing/product-page fetch+parse work on this thread.
+    dl_q: "queue.Queue" = queue.Queue(maxsize=DOWNLOAD_QUEUE_SIZE)
+    new_records: list[dict] = []
+    downloader = threading.Thread(
+        target=_download_worker, args=(dl_q, state, failures), daemon=True
+    )
+    downloader.start()
+
+    try:
+        for prod_type in run_types:
+            all_product_urls = set()
+            for ch in CHAR_BUCKETS:
+                url = listing_url(prod_type, ch)
+                try:
+                    html = c.fetch_html(url)
+                    urls = extract_product_links(url, html)
+                    all_product_urls.update(urls)
+                    print(f"[{prod_type.upper()} {ch}] products: {len(urls)}")
+                except Exception as e:
+                    failures.append({"stage": "listing", "type": prod_type, "url": url, "error": str(e)})
+                    print(f"[{prod_type.upper()} {ch}] listing failed: {e}")
+
+            all_product_urls = sorted(all_product_urls)
+            total_pages += len(all_product_urls)
+            print(f"\n[{prod_type.upper()}] Total product pages collected: {len(all_product_urls)}")
+
+            # Type-specific destination folder
+            dest_dir = type_pdf_dir(prod_type)
+
+            for i, purl in enumerate(all_product_urls, start=1):
+                try:
+                    html = c.fetch_html(purl)
+                    soup = BeautifulSoup(html, "lxml")
+
+                    product_name = extract_product_name(soup)
+                    if not product_name:
+                        raise ValueError("Missing product name (h1.pdetails)")
+
+                    pdf_url = extract_prescribing_pdf_url(purl, soup)
+                    if not pdf_url:
+                        continue
+
+                    original_pdf_filename = pdf_basename_from_url(pdf_url)
+                    if not original_pdf_filename:
+                        continue
+
+                    key = original_pdf_filename.lower()
+                    if key in seen_original_pdfs:
+                        print(f"[{prod_type} {i}/{len(all_product_urls)}] SKIP (already in JSON): {product_name} -> {original_pdf_filename}")
+                        continue
+
+                    safe_product = sanitize_windows_filename(product_name)
+                    desired_name = f"{safe_product}.pdf"
+                    out_path = unique_path(dest_dir / desired_name)
+
+                    record = {
+                        "type": prod_type,
+                        "product_name": product_name,
+                        "product_url": purl,
+                        "pdf_url": pdf_url,
+                        "original_pdf_filename": original_pdf_filename,
+                        "renamed_pdf_filename": out_path.name,
+                        "downloaded": False,
+                        "saved_path": str(out_path),  # optional but useful
+                    }
+
+                    # Save JSON BEFORE download
+                    items.append(record)
+                    new_records.append(record)
+                    seen_original_pdfs.add(key)
+                    append_seen(key)
+                    state["items"] = items
+                    state["failures"] = failures
+                    save_state(state)
+
+                    dl_q.put((record, f"[{prod_type} {i}/{len(all_product_urls)}]"))
+
+                except Exception as e:
+                    failures.append({"stage": "product", "type": prod_type, "url": purl, "error": str(e)})
+                    state["failures"] = failures
+                    save_state(state)
+                    print(f"[{prod_type} {i}/{len(all_product_urls)}] product failed: {purl} :: {e}")
+    finally:
+        dl_q.put(None)
+        downloader.join()
+        state["items"] = items
+        state["failures"] = failures
+        save_state(state, force=True)
+
+    new_downloads = sum(1 for r in new_records if r.get("downloaded"))
 
     print(f"\nSaved JSON → {OUT_JSON}")
     print(f"Data dir → {DATA_DIR} (downloads stored in type subfolders)")
@@ -14,21 +14,31 @@ Run:
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Iterable
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from dotenv import load_dotenv
 from google.api_core.client_options import ClientOptions
 from google.cloud import documentai_v1
+from google.cloud.documentai_v1.services.document_processor_service import transports
 from google.protobuf.json_format import MessageToDict
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.platypus import ListFlowable, ListItem
 from reportlab.lib.enums import TA_LEFT
 from reportlab.platypus import Preformatted
 
@@ -44,6 +54,31 @@ TRAIN_DATA_DIR = DATA_DIR / "train_data"
 
 ALLOWED_TYPES = {"pharma", "herbal", "agrovet", "other"}
 
+# Concurrent Document AI requests (the RPC is the dominant, I/O-bound cost)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "8"))
+RENDER_WORKERS = int(os.getenv("OCR_RENDER_WORKERS", "2"))
+
+# Optional per-PDF layout-JSON dump (debugging aid; off by default)
+OCR_SAVE_JSON = os.getenv("OCR_SAVE_JSON", "").strip().lower() in {"1", "true", "yes"}
+# Pretty-printing roughly doubles dump size/time; keep the debug blobs compact
+# unless someone actually wants to read them.
+OCR_JSON_PRETTY = os.getenv("OCR_JSON_PRETTY", "").strip().lower() in {"1", "true", "yes"}
+
+# OCR_MODE=batch routes each folder through one batch_process_documents LRO
+# (amortizes the per-request overhead) instead of a synchronous RPC per file.
+# Requires GCS_STAGING_BUCKET and the google-cloud-storage package.
+OCR_MODE = os.getenv("OCR_MODE", "sync").strip().lower()
+GCS_STAGING_BUCKET = os.getenv("GCS_STAGING_BUCKET", "").strip()
+OCR_BATCH_TIMEOUT = int(os.getenv("OCR_BATCH_TIMEOUT", "1800"))
+
+_print_lock = threading.Lock()
+
+
+def _log(msg: str) -> None:
+    """Print from worker threads without interleaving lines."""
+    with _print_lock:
+        print(msg)
+
 
 def _normalize_type(t: Optional[str]) -> Optional[str]:
     if not t:
@@ -76,20 +111,67 @@ def _out_dir_for_type(t: str) -> Path:
 # -----------------------------
 # PDF formatting helpers
 # -----------------------------
-_HEADING_RE = re.compile(r"^\s*(?:[A-Z][A-Z0-9 \-/&(),.%]{3,}|\d+(?:\.\d+)*\s+\S.+|.+:\s*)\s*$")
+# Heading alternation split so each variant only runs when the first
+# character already rules the others out (most lines bail on the cheap
+# string checks without touching the regex engine).
+_NUM_HEAD_RE = re.compile(r"^\d+(?:\.\d+)*\s+\S.+$")
+_UPPER_HEAD_RE = re.compile(r"^[A-Z][A-Z0-9 \-/&(),.%]{3,}$")
 _BULLET_RE = re.compile(r"^\s*(?:[-•*]|\d+[\.\)])\s+")
 
+# Compiled once; these run per line / per text block on large layouts.
+_MULTI_SPACE_RE = re.compile(r"[ \t]{2,}")
+_WS_RE = re.compile(r"[ \t]+")
+_MULTI_NL_RE = re.compile(r"\n{3,}")
+
+@functools.lru_cache(maxsize=8192)
+def _fix_text(s: str) -> str:
+    """Normalize one text run. Headers, footers and table cells repeat the
+    same runs across pages, so the result is memoized (bounded; cleared
+    between type batches in run_ocr)."""
+    s = s.replace("^{\\circ}", "°").replace("\\circ", "°").translate(_FIX_TRANS)
+    return _WS_RE.sub(" ", s).strip()
+
+
+# Line-wrap join: previous line ends lowercase/digit/light punctuation and the
+# next starts lowercase -> it was a hard wrap, not a real break.
+_WRAP_TAIL = frozenset("abcdefghijklmnopqrstuvwxyz0123456789,;:")
+_ASCII_LOWER = frozenset("abcdefghijklmnopqrstuvwxyz")
+
+
+def _join_wrapped_lines(text: str) -> str:
+    """Re-join hard-wrapped lines inside one block of text."""
+    if "\n" not in text:
+        return text
+    lines = text.split("\n")
+    parts = [lines[0]]
+    for ln in lines[1:]:
+        prev = parts[-1]
+        if prev and ln and prev[-1] in _WRAP_TAIL and ln[0] in _ASCII_LOWER:
+            parts[-1] = prev + " " + ln
+        else:
+            parts.append(ln)
+    return "\n".join(parts)
+
+# Single-pass character maps (translate beats chained replace/re.sub for
+# per-character rewrites)
+_FIX_TRANS = str.maketrans({"~": " ", "\t": " "})
+_CR_TRANS = str.maketrans({"\r": "\n"})
+
 
 def _cleanup_text(text: str) -> str:
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-    text = re.sub(r"[ \t]{2,}", " ", text)
+    # collapse \r\n first so the lone-\r translate can't double the newline
+    text = text.replace("\r\n", "\n").translate(_CR_TRANS)
+    text = _MULTI_SPACE_RE.sub(" ", text)
     text = "\n".join(line.rstrip() for line in text.splitlines())
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _MULTI_NL_RE.sub("\n\n", text)
     return text.strip()
 
 
+_XML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
 def _escape_xml(s: str) -> str:
-    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return s.translate(_XML_ESCAPE)
 
 
 def _looks_like_heading(line: str) -> bool:
@@ -100,50 +182,65 @@ def _looks_like_heading(line: str) -> bool:
         return False
     if s.endswith(".") and len(s.split()) > 3:
         return False
-    return bool(_HEADING_RE.match(s))
+    if s.endswith(":") and len(s) > 1:
+        return True
+    c = s[0]
+    if c.isdigit():
+        return bool(_NUM_HEAD_RE.match(s))
+    if "A" <= c <= "Z":
+        return bool(_UPPER_HEAD_RE.match(s))
+    return False
+
+
+# Styles are immutable once built; construct the sheet once at import time
+# instead of per exported PDF.
+_STYLES = getSampleStyleSheet()
+
+_STYLE_TITLE = ParagraphStyle(
+    "OCRTitle",
+    parent=_STYLES["Title"],
+    fontName="Helvetica-Bold",
+    fontSize=18,
+    leading=22,
+    alignment=TA_LEFT,
+    spaceAfter=12,
+)
+_STYLE_H = ParagraphStyle(
+    "OCRHeading",
+    parent=_STYLES["Heading2"],
+    fontName="Helvetica-Bold",
+    fontSize=13,
+    leading=17,
+    spaceBefore=10,
+    spaceAfter=6,
+)
+_STYLE_BODY = ParagraphStyle(
+    "OCRBody",
+    parent=_STYLES["BodyText"],
+    fontName="Helvetica",
+    fontSize=10.5,
+    leading=14,
+    spaceBefore=2,
+    spaceAfter=6,
+)
+
+# Monospace style for tables (no reflow)
+_STYLE_TABLE = ParagraphStyle(
+    "OCRTableMono",
+    parent=_STYLES["BodyText"],
+    fontName="Courier",
+    fontSize=9.5,
+    leading=12,
+    spaceBefore=6,
+    spaceAfter=6,
+)
 
 
 def _export_text_as_readable_pdf(title: str, text: str, out_pdf: Path) -> None:
-    styles = getSampleStyleSheet()
-
-    style_title = ParagraphStyle(
-        "OCRTitle",
-        parent=styles["Title"],
-        fontName="Helvetica-Bold",
-        fontSize=18,
-        leading=22,
-        alignment=TA_LEFT,
-        spaceAfter=12,
-    )
-    style_h = ParagraphStyle(
-        "OCRHeading",
-        parent=styles["Heading2"],
-        fontName="Helvetica-Bold",
-        fontSize=13,
-        leading=17,
-        spaceBefore=10,
-        spaceAfter=6,
-    )
-    style_body = ParagraphStyle(
-        "OCRBody",
-        parent=styles["BodyText"],
-        fontName="Helvetica",
-        fontSize=10.5,
-        leading=14,
-        spaceBefore=2,
-        spaceAfter=6,
-    )
-
-    # Monospace style for tables (no reflow)
-    style_table = ParagraphStyle(
-        "OCRTableMono",
-        parent=styles["BodyText"],
-        fontName="Courier",
-        fontSize=9.5,
-        leading=12,
-        spaceBefore=6,
-        spaceAfter=6,
-    )
+    style_title = _STYLE_TITLE
+    style_h = _STYLE_H
+    style_body = _STYLE_BODY
+    style_table = _STYLE_TABLE
 
     out_pdf.parent.mkdir(parents=True, exist_ok=True)
 
@@ -163,8 +260,6 @@ def _export_text_as_readable_pdf(title: str, text: str, out_pdf: Path) -> None:
 
     flow = [Paragraph(_escape_xml(title), style_title), Spacer(1, 6)]
 
-    lines = cleaned.splitlines()
-
     in_table = False
     table_lines: List[str] = []
     para_lines: List[str] = []
@@ -193,12 +288,22 @@ def _export_text_as_readable_pdf(title: str, text: str, out_pdf: Path) -> None:
 
             bullet_count = sum(1 for ln in ls if _BULLET_RE.match(ln))
             if bullet_count >= max(2, int(0.6 * len(ls))):
+                # One ListFlowable per run of bullets: platypus lays the run
+                # out as a unit instead of measuring N separate Paragraphs.
+                # Non-bullet continuation lines stay plain Paragraphs so the
+                # export doesn't invent a glyph for them.
+                items = []
                 for ln in ls:
                     if _BULLET_RE.match(ln):
                         content = _BULLET_RE.sub("", ln).strip()
-                        flow.append(Paragraph(_escape_xml(content), style_body, bulletText="•"))
-                    else:
-                        flow.append(Paragraph(_escape_xml(ln), style_body))
+                        items.append(ListItem(Paragraph(_escape_xml(content), style_body)))
+                        continue
+                    if items:
+                        flow.append(ListFlowable(items, bulletType="bullet", leftIndent=14))
+                        items = []
+                    flow.append(Paragraph(_escape_xml(ln), style_body))
+                if items:
+                    flow.append(ListFlowable(items, bulletType="bullet", leftIndent=14))
                 flow.append(Spacer(1, 4))
                 continue
 
@@ -218,28 +323,34 @@ def _export_text_as_readable_pdf(title: str, text: str, out_pdf: Path) -> None:
         flow.append(Preformatted(_escape_xml(table_text), style_table))
         flow.append(Spacer(1, 6))
 
-    for ln in lines:
-        raw = ln.rstrip("\n")
+    if "[TABLE]" not in cleaned:
+        # Fast path: no table markers, so every line is paragraph text and the
+        # per-line marker scan can be skipped entirely.
+        para_lines = cleaned.splitlines()
+        flush_para()
+    else:
+        for ln in cleaned.splitlines():
+            raw = ln.rstrip("\n")
+
+            if raw.strip() == "[TABLE]":
+                flush_para()
+                in_table = True
+                table_lines = []
+                continue
 
-        if raw.strip() == "[TABLE]":
-            flush_para()
-            in_table = True
-            table_lines = []
-            continue
+            if raw.strip() == "[/TABLE]":
+                in_table = False
+                flush_table()
+                continue
 
-        if raw.strip() == "[/TABLE]":
-            in_table = False
-            flush_table()
-            continue
+            if in_table:
+                table_lines.append(raw)
+            else:
+                para_lines.append(raw)
 
+        flush_para()
         if in_table:
-            table_lines.append(raw)
-        else:
-            para_lines.append(raw)
-
-    flush_para()
-    if in_table:
-        flush_table()
+            flush_table()
 
     doc.build(flow)
 
@@ -254,16 +365,16 @@ def _extract_text_from_layout_json(doc: dict) -> str:
         return ""
 
     out: List[str] = []
+    out_append = out.append  # bound method; these closures run per block
+    last_blank = True  # tracks whether the last emitted line was "" (or nothing yet)
 
     def fix_text(s: str) -> str:
-        s = str(s or "")
-        s = s.replace("^{\\circ}", "°").replace("\\circ", "°")
-        s = s.replace("~", " ")
-        s = re.sub(r"[ \t]+", " ", s).strip()
-        return s
+        return _fix_text(str(s or ""))
 
     def add_line(line: str = "") -> None:
-        out.append(line)
+        nonlocal last_blank
+        out_append(line)
+        last_blank = line == ""
 
     def render_text_block(tb: dict, level: int) -> None:
         text = fix_text(tb.get("text", ""))
@@ -272,14 +383,14 @@ def _extract_text_from_layout_json(doc: dict) -> str:
         if not text and not tb.get("blocks"):
             return
 
-        if typ.startswith("heading"):
-            if out and out[-1] != "":
+        if typ[:7] == "heading":
+            if not last_blank:
                 add_line("")
             add_line(text.upper())
             add_line("")
         else:
             if text:
-                add_line(text)
+                add_line(_join_wrapped_lines(text))
 
         children = tb.get("blocks") or []
         if children:
@@ -300,18 +411,18 @@ def _extract_text_from_layout_json(doc: dict) -> str:
         if not body_rows:
             return
 
-        if out and out[-1] != "":
+        if not last_blank:
             add_line("")
         add_line("[TABLE]")
 
         for row in body_rows:
-            cells = row.get("cells") or []
-            row_cells = [cell_text_from_cell(c) for c in cells]
-            while row_cells and not row_cells[-1]:
-                row_cells.pop()
-
-            if any(row_cells):
-                add_line(" | ".join(row_cells))
+            row_cells = [cell_text_from_cell(c) for c in (row.get("cells") or [])]
+            # index of the last non-empty cell; avoids the pop-per-cell loop
+            last = len(row_cells) - 1
+            while last >= 0 and not row_cells[last]:
+                last -= 1
+            if last >= 0:
+                add_line(" | ".join(row_cells[: last + 1]))
 
         add_line("[/TABLE]")
         add_line("")
@@ -330,20 +441,124 @@ def _extract_text_from_layout_json(doc: dict) -> str:
 
             lb = b.get("list_block")
             if lb:
-                if out and out[-1] != "":
+                if not last_blank:
                     add_line("")
                 for item in lb.get("list_entries") or []:
                     t = fix_text(item.get("text", ""))
                     if t:
-                        add_line(f"• {t}")
+                        add_line(f"• {_join_wrapped_lines(t)}")
+                add_line("")
+                continue
+
+    render_blocks(blocks, level=0)
+
+    # Wrap joining already happened per block at emit time, so the joined
+    # document needs just the blank-line collapse — no second full-text regex pass.
+    text = "\n".join(out)
+    text = _MULTI_NL_RE.sub("\n\n", text).strip()
+
+    return text
+
+
+def _extract_text_from_layout_proto(layout) -> str:
+    """
+    Proto twin of _extract_text_from_layout_json: walks Document.document_layout
+    directly (attribute access is C-level), so the hot path no longer needs the
+    full MessageToDict materialization of the Document AI response.
+    """
+    blocks = list(layout.blocks) if layout is not None else []
+    if not blocks:
+        return ""
+
+    out: List[str] = []
+    out_append = out.append  # bound method; these closures run per block
+    last_blank = True
+
+    def fix_text(s) -> str:
+        return _fix_text(str(s or ""))
+
+    def add_line(line: str = "") -> None:
+        nonlocal last_blank
+        out_append(line)
+        last_blank = line == ""
+
+    def render_text_block(tb, level: int) -> None:
+        text = fix_text(tb.text)
+        typ = (tb.type_ or "").strip()
+        children = tb.blocks
+
+        if not text and not children:
+            return
+
+        if typ[:7] == "heading":
+            if not last_blank:
+                add_line("")
+            add_line(text.upper())
+            add_line("")
+        else:
+            if text:
+                add_line(_join_wrapped_lines(text))
+
+        if children:
+            render_blocks(children, level + 1)
+
+    def cell_text_from_cell(cell) -> str:
+        parts = []
+        for cb in cell.blocks:
+            t = fix_text(cb.text_block.text)
+            if t:
+                parts.append(t)
+        return " ".join(parts).strip()
+
+    def render_table(tab) -> None:
+        body_rows = tab.body_rows
+        if not body_rows:
+            return
+
+        if not last_blank:
+            add_line("")
+        add_line("[TABLE]")
+
+        for row in body_rows:
+            row_cells = [cell_text_from_cell(c) for c in row.cells]
+            # index of the last non-empty cell; avoids the pop-per-cell loop
+            last = len(row_cells) - 1
+            while last >= 0 and not row_cells[last]:
+                last -= 1
+            if last >= 0:
+                add_line(" | ".join(row_cells[: last + 1]))
+
+        add_line("[/TABLE]")
+        add_line("")
+
+    def render_blocks(bs, level: int) -> None:
+        for b in bs:
+            # oneof: at most one of these sub-messages is populated
+            tb = b.text_block
+            if tb.text or tb.blocks:
+                render_text_block(tb, level)
+                continue
+
+            tab = b.table_block
+            if tab.body_rows:
+                render_table(tab)
+                continue
+
+            lb = b.list_block
+            if lb.list_entries:
+                if not last_blank:
+                    add_line("")
+                for item in lb.list_entries:
+                    t = fix_text(getattr(item, "text", ""))
+                    if t:
+                        add_line(f"• {_join_wrapped_lines(t)}")
                 add_line("")
                 continue
 
     render_blocks(blocks, level=0)
 
     text = "\n".join(out)
-    text = re.sub(r"\n{3,}", "\n\n", text).strip()
-    text = re.sub(r"([a-z0-9,;:])\n([a-z])", r"\1 \2", text)
+    text = _MULTI_NL_RE.sub("\n\n", text).strip()
 
     return text
 
@@ -358,19 +573,43 @@ def _get_env(name: str) -> str:
     return v
 
 
-def _init_docai_client():
-    project_id = _get_env("GCP_PROJECT_ID")
-    processor_id = _get_env("GCP_DOCAI_PROCESSOR_ID")
-    location = _get_env("GCP_DOCAI_LOCATION")
-
-    opts = ClientOptions(api_endpoint=f"{location}-documentai.googleapis.com")
-    client = documentai_v1.DocumentProcessorServiceClient(client_options=opts)
+@functools.lru_cache(maxsize=4)
+def _get_docai_client(project_id: str, location: str, processor_id: str):
+    """
+    Build (client, processor) once per processor identity. run_ocr is invoked
+    once per train_type by build_index; caching reuses the gRPC channel and
+    skips the TLS handshake + get_processor RPC on every call after the first.
+    """
+    endpoint = f"{location}-documentai.googleapis.com"
+    # Keepalives stop idle-channel teardown between PDFs; the receive cap is
+    # lifted because layout responses for large PDFs exceed the 4 MB default.
+    channel = transports.DocumentProcessorServiceGrpcTransport.create_channel(
+        host=endpoint,
+        options=[
+            ("grpc.keepalive_time_ms", 30_000),
+            ("grpc.keepalive_timeout_ms", 10_000),
+            ("grpc.max_receive_message_length", 256 * 1024 * 1024),
+        ],
+    )
+    transport = transports.DocumentProcessorServiceGrpcTransport(channel=channel)
+    client = documentai_v1.DocumentProcessorServiceClient(
+        transport=transport,
+        client_options=ClientOptions(api_endpoint=endpoint),
+    )
 
     full_processor_name = client.processor_path(project_id, location, processor_id)
     processor = client.get_processor(request=documentai_v1.GetProcessorRequest(name=full_processor_name))
     return client, processor
 
 
+def _init_docai_client():
+    return _get_docai_client(
+        _get_env("GCP_PROJECT_ID"),
+        _get_env("GCP_DOCAI_LOCATION"),
+        _get_env("GCP_DOCAI_PROCESSOR_ID"),
+    )
+
+
 def _process_pdf_bytes(client, processor, pdf_bytes: bytes) -> documentai_v1.Document:
     raw_document = documentai_v1.RawDocument(content=pdf_bytes, mime_type="application/pdf")
     req = documentai_v1.ProcessRequest(name=processor.name, raw_document=raw_document)
@@ -378,28 +617,34 @@ def _process_pdf_bytes(client, processor, pdf_bytes: bytes) -> documentai_v1.Doc
     return result.document
 
 
+def _delete_by_suffix(dir_path: Path, suffix: str, what: str) -> None:
+    """Delete every regular file under dir_path with the given suffix."""
+    errors: List[str] = []
+    try:
+        it = os.scandir(dir_path)
+    except FileNotFoundError:
+        return
+    with it:
+        for e in it:
+            if e.is_file() and e.name.lower().endswith(suffix):
+                try:
+                    os.unlink(e.path)
+                except FileNotFoundError:
+                    pass
+                except Exception as exc:
+                    errors.append(f"{e.name}: {exc}")
+    if errors:
+        print(f"WARNING: failed to delete {len(errors)} {what} file(s): " + "; ".join(errors))
+
+
 def _cleanup_ocr_inputs(in_dir: Path) -> None:
     """Delete all PDF files from the OCR input folder."""
-    if not in_dir.exists():
-        return
-    for p in in_dir.iterdir():
-        if p.is_file() and p.suffix.lower() == ".pdf":
-            try:
-                p.unlink()
-            except Exception as e:
-                print(f"WARNING: failed to delete OCR input {p.name}: {e}")
+    _delete_by_suffix(in_dir, ".pdf", "OCR input")
 
 
 def _cleanup_train_json(train_dir: Path) -> None:
     """Delete all JSON files from the train folder."""
-    if not train_dir.exists():
-        return
-    for p in train_dir.iterdir():
-        if p.is_file() and p.suffix.lower() == ".json":
-            try:
-                p.unlink()
-            except Exception as e:
-                print(f"WARNING: failed to delete train JSON {p.name}: {e}")
+    _delete_by_suffix(train_dir, ".json", "train JSON")
 
 
 def _move_txt_docx_inputs(in_dir: Path, out_dir: Path) -> None:
@@ -407,12 +652,164 @@ def _move_txt_docx_inputs(in_dir: Path, out_dir: Path) -> None:
     if not in_dir.exists():
         return
     out_dir.mkdir(parents=True, exist_ok=True)
-    for p in in_dir.iterdir():
-        if p.is_file() and p.suffix.lower() in {".txt", ".docx"}:
+    with os.scandir(in_dir) as it:
+        for e in it:
+            name_lower = e.name.lower()
+            if e.is_file() and (name_lower.endswith(".txt") or name_lower.endswith(".docx")):
+                try:
+                    os.replace(e.path, out_dir / e.name)
+                except Exception as exc:
+                    print(f"WARNING: failed to move {e.name}: {exc}")
+
+
+def _save_layout_json(doc_json: Dict[str, Any], json_out: Path) -> None:
+    """Dump the DocAI dict to disk: orjson when installed (serializes to bytes
+    in C), otherwise json.dump streaming chunk-by-chunk."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if OCR_JSON_PRETTY else 0
+        json_out.write_bytes(orjson.dumps(doc_json, option=option))
+        return
+    with json_out.open("w", encoding="utf-8") as f:
+        if OCR_JSON_PRETTY:
+            json.dump(doc_json, f, ensure_ascii=False, indent=2)
+        else:
+            json.dump(doc_json, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _ocr_one(client, processor, t: str, pdf_path: Path) -> documentai_v1.Document:
+    """Network stage: one Document AI round-trip for one PDF."""
+    _log(f"[{_cap_type(t)}] OCR -> {pdf_path.name}")
+    return _process_pdf_bytes(client, processor, pdf_path.read_bytes())
+
+
+def _render_one(t: str, pdf_path: Path, document: documentai_v1.Document, out_dir: Path) -> None:
+    """Local stage: extract text from the response and write the readable PDF."""
+    if OCR_SAVE_JSON:
+        # Only pay for the full dict materialization when the dump is wanted
+        # (snake_case keys due to preserving_proto_field_name=True)
+        doc_json: Dict[str, Any] = MessageToDict(
+            document._pb,  # type: ignore[attr-defined]
+            preserving_proto_field_name=True,
+        )
+        json_out = out_dir / f"{pdf_path.stem}.layout.json"
+        _save_layout_json(doc_json, json_out)
+        _log(f"[{_cap_type(t)}] Saved JSON: {json_out.name}")
+
+    layout = document.document_layout
+    text = _extract_text_from_layout_proto(layout)
+
+    # Debug counters
+    _log(
+        f"[{_cap_type(t)}] {pdf_path.name}: pages {len(document.pages)} | "
+        f"layout blocks {len(layout.blocks)} | text length {len(text)}"
+    )
+
+    out_pdf = out_dir / f"{pdf_path.stem}.pdf"
+    _export_text_as_readable_pdf(pdf_path.stem, text, out_pdf)
+
+    _log(f"[{_cap_type(t)}] Saved PDF : {out_pdf.name}")
+
+
+def _process_batch(client, processor, t: str, pdfs: List[Path], out_dir: Path) -> int:
+    """
+    OCR a whole folder with one batch_process_documents LRO.
+
+    PDFs are staged to gs://GCS_STAGING_BUCKET/docai/<Type>/input/ and the
+    resulting Document JSONs land under .../output/; each result is parsed
+    back into a Document proto and rendered locally with the same extract +
+    readable-PDF path as sync mode. Returns the number of PDFs rendered.
+    """
+    from google.cloud import storage  # only needed in batch mode
+
+    cap = _cap_type(t)
+    if not GCS_STAGING_BUCKET:
+        raise RuntimeError("OCR_MODE=batch requires GCS_STAGING_BUCKET in .env")
+
+    gcs = storage.Client()
+    bucket = gcs.bucket(GCS_STAGING_BUCKET)
+    input_prefix = f"docai/{cap}/input"
+    output_prefix = f"docai/{cap}/output"
+
+    gcs_documents = []
+    for pdf_path in pdfs:
+        bucket.blob(f"{input_prefix}/{pdf_path.name}").upload_from_filename(str(pdf_path))
+        gcs_documents.append(
+            documentai_v1.GcsDocument(
+                gcs_uri=f"gs://{GCS_STAGING_BUCKET}/{input_prefix}/{pdf_path.name}",
+                mime_type="application/pdf",
+            )
+        )
+    print(f"[{cap}] Staged {len(gcs_documents)} PDF(s) to gs://{GCS_STAGING_BUCKET}/{input_prefix}")
+
+    req = documentai_v1.BatchProcessRequest(
+        name=processor.name,
+        input_documents=documentai_v1.BatchDocumentsInputConfig(
+            gcs_documents=documentai_v1.GcsDocuments(documents=gcs_documents)
+        ),
+        document_output_config=documentai_v1.DocumentOutputConfig(
+            gcs_output_config=documentai_v1.DocumentOutputConfig.GcsOutputConfig(
+                gcs_uri=f"gs://{GCS_STAGING_BUCKET}/{output_prefix}/"
+            )
+        ),
+    )
+
+    operation = client.batch_process_documents(request=req)
+    print(f"[{cap}] Waiting on batch operation (timeout {OCR_BATCH_TIMEOUT}s)...")
+    operation.result(timeout=OCR_BATCH_TIMEOUT)
+
+    # The LRO metadata maps each input URI to its operation-scoped output
+    # directory, so listing never sees stale JSONs from earlier runs under
+    # the same prefix and each result is tied to its exact input filename.
+    metadata = documentai_v1.BatchProcessMetadata(operation.metadata)
+    stem_by_name = {p.name: p.stem for p in pdfs}
+    shard_idx_re = re.compile(r"-(\d+)\.json$", re.IGNORECASE)
+
+    def render_status(status) -> None:
+        input_name = status.input_gcs_source.rsplit("/", 1)[-1]
+        stem = stem_by_name.get(input_name)
+        if stem is None:
+            raise RuntimeError(f"unexpected input in batch metadata: {status.input_gcs_source}")
+        if status.status.code:
+            raise RuntimeError(status.status.message or f"status code {status.status.code}")
+        m = re.match(r"gs://([^/]+)/(.+)", status.output_gcs_destination)
+        if m is None:
+            raise RuntimeError(f"bad output destination: {status.output_gcs_destination!r}")
+        dest_bucket, dest_prefix = m.groups()
+        shards = [
+            blob
+            for blob in gcs.list_blobs(dest_bucket, prefix=dest_prefix)
+            if blob.name.lower().endswith(".json")
+        ]
+        if not shards:
+            raise RuntimeError(f"no output JSON under {status.output_gcs_destination}")
+        # large inputs are sharded (~20 pages per JSON, named ...-<idx>.json);
+        # stitch the shards back together in index order before rendering
+        shards.sort(key=lambda b: int(sm.group(1)) if (sm := shard_idx_re.search(b.name)) else 0)
+        parts = []
+        for blob in shards:
+            document = documentai_v1.Document.from_json(
+                blob.download_as_bytes(), ignore_unknown_fields=True
+            )
+            parts.append(_extract_text_from_layout_proto(document.document_layout))
+        text = "\n".join(p for p in parts if p)
+        out_pdf = out_dir / f"{stem}.pdf"
+        _export_text_as_readable_pdf(stem, text, out_pdf)
+        _log(f"[{cap}] Saved PDF : {out_pdf.name}")
+
+    ok = 0
+    with ThreadPoolExecutor(max_workers=min(OCR_WORKERS, len(pdfs))) as pool:
+        futures = {
+            pool.submit(render_status, status): status.input_gcs_source.rsplit("/", 1)[-1]
+            for status in metadata.individual_process_statuses
+        }
+        for fut in as_completed(futures):
+            name = futures[fut]
             try:
-                p.replace(out_dir / p.name)
+                fut.result()
+                ok += 1
             except Exception as e:
-                print(f"WARNING: failed to move {p.name}: {e}")
+                _log(f"[{cap}] FAILED: {name} -> {e}")
+    return ok
 
 
 # -----------------------------
@@ -443,7 +840,12 @@ def run_ocr(train_type: str | None = None) -> None:
         # move txt/docx straight to train_data before OCR
         _move_txt_docx_inputs(in_dir, out_dir)
 
-        pdfs = sorted([p for p in in_dir.iterdir() if p.is_file() and p.suffix.lower() == ".pdf"])
+        # scandir reuses the dirent's type info instead of a stat() per entry
+        with os.scandir(in_dir) as it:
+            pdfs = sorted(
+                (Path(e.path) for e in it if e.is_file() and e.name.lower().endswith(".pdf")),
+                key=lambda p: p.name,
+            )
         if not pdfs:
             print(f"[{_cap_type(t)}] No PDFs found in: {in_dir}")
             continue
@@ -452,39 +854,57 @@ def run_ocr(train_type: str | None = None) -> None:
         print(f"[{_cap_type(t)}] Using processor: {processor.name}")
 
         ok = 0
-        for pdf_path in pdfs:
+        if OCR_MODE == "batch":
             try:
-                print(f"\n[{_cap_type(t)}] OCR -> {pdf_path.name}")
-
-                document = _process_pdf_bytes(client, processor, pdf_path.read_bytes())
-
-                # Convert to JSON dict and save (snake_case due to preserving_proto_field_name=True)
-                doc_json: Dict[str, Any] = MessageToDict(
-                    document._pb,  # type: ignore[attr-defined]
-                    preserving_proto_field_name=True,
-                )
-                #json_out = out_dir / f"{pdf_path.stem}.layout.json"
-                #json_out.write_text(json.dumps(doc_json, ensure_ascii=False, indent=2), encoding="utf-8")
-
-                text = _extract_text_from_layout_json(doc_json)
-
-                # Debug counters (snake_case keys)
-                pages = doc_json.get("pages") or []
-                layout_blocks = ((doc_json.get("document_layout") or {}).get("blocks")) or []
-                print(f"[{_cap_type(t)}] Pages: {len(pages)} | Layout blocks: {len(layout_blocks)}")
-                print(f"[{_cap_type(t)}] Extracted text length: {len(text)}")
-
-                out_pdf = out_dir / f"{pdf_path.stem}.pdf"
-                _export_text_as_readable_pdf(pdf_path.stem, text, out_pdf)
-
-                #print(f"[{_cap_type(t)}] Saved JSON: {json_out.name}")
-                print(f"[{_cap_type(t)}] Saved PDF : {out_pdf.name}")
-                ok += 1
+                ok = _process_batch(client, processor, t, pdfs, out_dir)
             except Exception as e:
-                print(f"[{_cap_type(t)}] FAILED: {pdf_path.name} -> {e}")
+                print(f"[{_cap_type(t)}] Batch OCR failed: {e}")
+            print(f"\n[{_cap_type(t)}] Done. Successfully processed {ok}/{len(pdfs)} file(s).")
+            _fix_text.cache_clear()
+            _cleanup_ocr_inputs(in_dir)
+            continue
+
+        # Two-stage pipeline: a wide pool for the Document AI round-trips
+        # (I/O bound) feeding a narrow pool for extraction + ReportLab
+        # rendering (CPU bound), so slow renders never hold an RPC slot.
+        # The semaphore caps how many un-rendered responses sit in memory;
+        # when the renderers fall behind, the feed loop stalls instead of
+        # queueing every response proto for the whole folder.
+        render_window = threading.Semaphore(RENDER_WORKERS * 2)
+        with ThreadPoolExecutor(max_workers=min(OCR_WORKERS, len(pdfs))) as rpc_pool, \
+                ThreadPoolExecutor(max_workers=RENDER_WORKERS) as render_pool:
+            rpc_futures = {
+                rpc_pool.submit(_ocr_one, client, processor, t, pdf_path): pdf_path
+                for pdf_path in pdfs
+            }
+            render_futures = {}
+            for fut in as_completed(rpc_futures):
+                # pop so the future (and the response proto it holds) can be
+                # collected as soon as the render task finishes with it
+                pdf_path = rpc_futures.pop(fut)
+                try:
+                    document = fut.result()
+                except Exception as e:
+                    _log(f"[{_cap_type(t)}] FAILED: {pdf_path.name} -> {e}")
+                    continue
+                render_window.acquire()
+                rfut = render_pool.submit(_render_one, t, pdf_path, document, out_dir)
+                rfut.add_done_callback(lambda _f: render_window.release())
+                render_futures[rfut] = pdf_path
+                del document
+            for fut in as_completed(render_futures):
+                pdf_path = render_futures[fut]
+                try:
+                    fut.result()
+                    ok += 1
+                except Exception as e:
+                    _log(f"[{_cap_type(t)}] FAILED: {pdf_path.name} -> {e}")
 
         print(f"\n[{_cap_type(t)}] Done. Successfully processed {ok}/{len(pdfs)} file(s).")
 
+        # Drop memoized text runs once the type batch is rendered
+        _fix_text.cache_clear()
+
         # Cleanup only this type's input/output JSON
         _cleanup_ocr_inputs(in_dir)
         #_cleanup_train_json(out_dir)
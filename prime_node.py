@@ -1,12 +1,83 @@
 # prime_node.py
 from __future__ import annotations
 
+import base64
 import json
-from typing import Dict, List
+from array import array
+from typing import Any, Dict, List
 
 
 ALLOWED_TYPES = {"pharma", "herbal", "agrovet"}
 
+# 768-dim prime-node embedding, base64-encoded little-endian float32.
+# Decoding is a single memcpy into an array("f") instead of 768 float
+# literals parsed at import time (and the source stays a fraction of the size).
+_PRIME_VALUES_B64 = (
+    "omYTPaDSPLzuW6q8DtSUONw3UT0DfYc8jUwiPBiMFL2UEg89HOpTvcl7TbyGzO68K8FgvVWngjyY"
+    "4Ik8TpCnPYABKz3CeJo9KUxnvKwB/TvVa/07OSHEPPy+yTqe1oY7ZXGNO6BU87utHVw66mFaPAdn"
+    "Vb1exS49rBI7PZ7LlTu4Oys8Lhp1vA0TDD1aKS8826mCu/ZA0zsfWxu9SKMovd4fJr3jyVM6AGuC"
+    "vDTmiLxzwKS8C9myPFS26rxSrJU52SmYvBJ5ubxMGQe9vP8zPIE7F7hvHkW8KW4vu5icEz3Ermo6"
+    "BsARvf3I9jsirAe7Ek5jPCd81TzunZY8Hob7PBc+iD28kOS8StRuvIXjCT3WnQS9iJcBvSpTJr1R"
+    "YRK9YWo9vMflz7wvRpi8jj/evGBp8rzJf4g8vLk+PWGQDT3su1A8MZngPOzqcbz26Pc8hGZIvTFp"
+    "lbxOii29Gw6AvIbAtb12aY89t6Nju4JjlrwxZ4M8togGPcMqvTsvlFO94D/hPEbRhL0t3h29H3CR"
+    "u3RGpr10Oe28r/ThPJ9uIr1dnq695lgLvUc4NzzAaR+9YPMwPMb+Xzxg4ba8Ml9DPCWj/by97gM6"
+    "DUTQvQCbrD0c2Gg8Po5PPZMSurz8WsE8yIm+PJaKoDw17og8QLiLPU6w2jxt8808/ogMPCp0aDvl"
+    "FaG8IrhTveOIojrxcIY9lLIVvbxkuzwO3og8GSnkvDl3XjyQCny8FBC5PN1qgL0SUn48IMwtPHr3"
+    "0DvoiS29kVcEPepTqrzhT4y8QWLPvN6lTL2m6xc8C9jWvPSPgz0RdJg9hSuYvDVj1jxjkjg9Dk8n"
+    "PBlrSz1njSa9wjGKve+y7Tw1FtE83vlbPO77NT3B3gs9FQXQu1HmHrzMVQe818cwO7Q+Fr2AWvu8"
+    "HwRHvbPmWz2tSPG8tjZTvGzAMT1hIIs9pPgrPVW3Aj1gmLs7chBzvR/xKz3O15O8wPJJO31fGTxX"
+    "nNq8JwWtPemNyDy/xpI9tz6vPKxgMb3XEC69IkrZPHzUFL28q0A949CCOjtA97zkRRM9NpCZvMV1"
+    "MT0iNNw8GNEXPTofkbuV5fu8pGeYvZHkkbxLKfC8c08avVdOuzt2iBE9bLVavbq4M7yJDHU9X8/B"
+    "OSHs6DywsEU8J+sOPfPYDjyOVuc8B2wqvSqGyDxcR307wBmXvJqgbrzhjxC9WmO4PXQJZz3CyRK9"
+    "zZ+kvF8KBD3A2rU8Uo+ou5TKOz22O3K8HcetvMwnSbycusU8j8uJvAkF/7tKNzy9viLKO84ZfD3x"
+    "FfO7RWwgPWxSWD0gLa+7Qj7WvHz4jLzcCY69kx+FvOB8CjzoWxG7DtNbPfOflzxpOEC9t35PvaWM"
+    "Tb1fN088O/VtPQBejz1Holq9hSuEPVqQ/bse8608vdK/O4Tm0L3oBEy9DP1ivS0+cjzG9JA8YNQW"
+    "Pe8hY7yYCpS9OYSuu91x5brpQxu8wuoCPO9yqTyVd1y9S4rkvHp7lzyHBdo86SHYPApcS70eN7I7"
+    "7wQAvU1cJbym30y9prx5vD2e1zzujkA8ICk0PRYhV73dChC9ReM3PRX/YjtXc368iv8uPU9rnDyS"
+    "6SY9ArS5PDJSmbvNoJk8aO0ju5SNEzz8oYm87bacO9hURL1xzYG+1hcwPEC8Ub18E6C8Zz8MPfrp"
+    "67ydweU8u1Q+vcdMszzzakm8mkzMvC6xiLxAOks9S641PANsHT0Ua389wVWyPE5vj73xkQw9nk9R"
+    "PeeQBD2HriG9GSxpvfx1Qj2XPby89qPvu3ioD71CeHU8Gl9pvcqSo7whqB08RffGvOTQML05JYI7"
+    "qYRDvDzA1bxJ58A8COQuPOXZK7wpHpK8Ex/iu9GsUzzgjHG69JLlvBi7MD3kejQ8rXDUvXlL6ryO"
+    "uum85GGJPZ1cbDuYhpy9B0uaPPdyeDyCA3c8LddLvWwroTzXUA89HCFyvbTW+bwQMJw77TM3vdqC"
+    "hL1ouYm9tqDOu1dILb3EjQm96uVjvcsA5jxXnoI98m9AvdMz8juNLp689aO8vWOH5rxB6T28R3SH"
+    "PHnbLD1glw+6JrTaPDroCrx2lBu9jFUhPSEM2LxEQV+7y8H8vA2lpDwpDwO9RK2LvAOkKb0IRBU9"
+    "U0oIvSDSRryEKzQ9NbZFPIOW5DuMgp68pHbyvC1BFj1ct8e85uxPPMy1iDzrChw9HcGLvZ9OsLz6"
+    "dFY8fU7gvO3nAb0MNWc9q0AJvXWIqTt6vfC7ZEX4O+Mpbr1/49Q894k9vdQaSj0S9EA9ZUGPO+kL"
+    "Wr0j4LU85bstPXGWEr0ckJS8bg32vHTadrwFGIM9FEyaO2RgmjxygYk9UOk9vXYG5ztqXb68uWYG"
+    "vecL6zyAOyM8fwlZvMq4azvr9oi89zmtvGmhPjy5U/k75z4aPIENJz0nhVs909OvPGDNfbudP967"
+    "tstivWMoJD11xIW7MYw/PCgo5DtcQJW8AHEgPQDwmDy0Iag9T1tkvCjzHb2H4Uq9WK+FO5QteTwN"
+    "hJ28FL4gPWpoQLxGj4w98JHSvE9Yo7y7XfG8ujHmOZPefj3WBZa9YiUxPFhyJ7xJi6y8v8c5OpB7"
+    "ZjyP+hc95V2BOn1l9DtlgSU8t41HvYxTQr3S14+8kVQ0PZXUyTyyntG7bOW+vHQlA7335YG88dMI"
+    "vfULrTx7KMA8N0SrvH1Bh7ynrve8dmYWPaHbsDzBCLw8+GcbvNRFPb3/0gK75/6hvKvzJzyGXzA8"
+    "SSe3vRbD0zxYMco7PJHdvMqQaryfCQq9SFZ3vTYEDr1IsIa9cSWOvFjsxrxQW048y0IDPNxdvjoN"
+    "xda8S0tYPTjhp7wz95w8RH8GO04KBrxr5SU926WOPHK1H7weF4o8RrW4vDwxAz03+4G8LobnPCdu"
+    "4Dzn+Eg8aanCO24ThL3bHqA695TcPKuo+TzpXL+8Vhv5uv2Sv7yNlDI8FVGGPMQwYDz9xaY8cP7I"
+    "vFbb77yBH2U9s9rOO51pLj3m9Oy7BTYpvK41KT1pbAi87WYNvZsMkzwwUU29AJRWPX2HIzw1Zew8"
+    "ESvyvGR8eD12LVE9kEGhPIf/H7zuFyG9bVnnPP7gSb1MdQQ8TYyEvDuOWb0RuSE9WEPDPKb9XL24"
+    "qrC8WqTkvGN1bT1JDHK9AlhuvUrmzzylgo+4LgdOPKcIqjwNLim9anTBvPibKrsvbj+91dsHPSfX"
+    "V7xRx5s9EvqXvZg+ED1q9kW8q/yOPIKC+DyIX/s83/iQux7toTtFIqc7wdwFPZZkOD1dmQU8pzEF"
+    "vVYciT1vXvA8zaELvf7v7Lq5vTg8gRMKvElPD70qOpQ97dXZPLO6sLy56RG82B2hu/qgN732eUU9"
+    "OOw/PT9DOz0a7xi9ieCNPXF+bjy1Df07CX09PXT8CD35UEi945VIOwIzij2wJig9E96BOvSd/Tz/"
+    "/vI7AovkvPowR72wPNu7tjQjPN/t/rq8DXs8uk4YvVgKkD0yEwQ9JLs0PUyBw7tOIw49DaQkPADN"
+    "8rvTzps7CuOmPArkt7zo8/U80RkpPHWrG7zbRw88TNHXPHYlQz2e/UE8C9kjvUN3Ujwvpgm86maW"
+    "PELnlj3UMBi9Qog8vXld0rtzEMU8ozkmvSHzZryZ5Rs9EomgvKKZ37v6YyS9v8RaO4EJrLyhVEo9"
+    "ypJ+PRDAIboZvu+7tb6ZPXPrszwygD69nAMtvUyuhb0nFsq6z1F+vbNXgL2C0Dm97wknPfRhw7wN"
+    "De68z4bcvOYBibwUL447HDCFvY6DszxY8/88yNGCPd0Wxrt6igg8Qf0RPe0Qqjz9mRC9JFCPPVDi"
+    "iDwGhzY9YJyMvH4ODjzBp3K9hFshPVeq87s0UYE5UjhUvWFB1TwMnjg9il1Gu8SouzuUiYA82jIC"
+    "PUwtKb13kBe9KuOGPJHasDxW8Zs8cX+zvOKCBD3A+oc9k0H4PNVWQr1/A3c8Z1qJO4IlCrzRnxy7"
+    "py0Tvag1t7wNgSC853RjOg+71Tzmxge927UVvYtIR7w2YB08LUKAu5q8BD0IALa8hZeyO8JyJLtG"
+    "vg+7ZvvwvbC5wzwVV9k8/9ntPIaygDysuTW9ckncPOT4Ir0c1Bk9KhoUPZfWOrzKYfA8"
+)
+
+
+def _decode_prime_values() -> List[float]:
+    arr = array("f", base64.b64decode(_PRIME_VALUES_B64))
+    return arr.tolist()
+
+
+_PRIME_VALUES: List[float] = _decode_prime_values()
+
+
 
 def _normalize_type(train_type: str) -> str:
     t = (train_type or "").strip().lower()
@@ -19,20 +90,20 @@ def _cap_type(t: str) -> str:
     return t.strip().lower().capitalize()
 
 
-def get_prime_node(train_type: str) -> Dict:
+def get_prime_node(train_type: str) -> Dict[str, Any]:
     """
     Build a Pinecone vector payload for a type-specific Prime Node.
     Node IDs:
       - Prime_Node_Pharma
       - Prime_Node_Herbal
     """
-    t = _normalize_type(train_type)
-    cap = _cap_type(t)
+    t: str = _normalize_type(train_type)
+    cap: str = _cap_type(t)
 
-    record_id = f"Prime_Node_{cap}"
+    record_id: str = f"Prime_Node_{cap}"
 
-    # Your existing embedding vector (unchanged)
-    values = [0.0359865502, -0.0115248263, -0.0207957886, 0.000070966882, 0.0510786623, 0.0165391024, 0.00990594644, -0.0362664163, 0.0349298269, -0.051736936, -0.0125417197, -0.0291502587, -0.0548717193, 0.0159489308, 0.0168307275, 0.0818182081, 0.0417494774, 0.0754256397, -0.0141172791, 0.00772114657, 0.00773380185, 0.023941623, 0.00153920008, 0.00411494, 0.0043164962, -0.00742585957, 0.000839675602, 0.0133290086, -0.0521002077, 0.0426686928, 0.0456721038, 0.0045713922, 0.0104512498, -0.014959855, 0.0341978557, 0.0106910113, -0.00398753351, 0.00644695293, -0.0379286967, -0.0411713421, -0.0405577347, 0.00080790947, -0.0159201622, -0.0167113319, -0.0201112982, 0.0218320098, -0.0286513939, 0.000285478833, -0.018574642, -0.0226407386, -0.0329831094, 0.0109862648, -0.0000360566228, -0.0120311817, -0.00267685414, 0.0360380113, 0.000895243371, -0.0355835184, 0.00753128389, -0.00207019644, 0.0138735939, 0.026060177, 0.0183858536, 0.0307036, 0.066524677, -0.027901046, -0.0145769808, 0.0336642452, -0.0323770866, -0.0316386521, -0.0406066552, -0.0357373394, -0.0115610072, -0.0253781211, -0.0185881536, -0.0271299146, -0.0295912623, 0.0166624952, 0.0465638489, 0.0345615186, 0.0127401166, 0.0274167974, -0.0147654824, 0.0302624516, -0.0489258915, -0.0182386357, -0.0423682258, -0.015631726, -0.0887461156, 0.0700253695, -0.00347350328, -0.0183579959, 0.0160404164, 0.0328452215, 0.00577292, -0.0516549908, 0.0274962783, -0.0648522824, -0.0385419615, -0.0044384147, -0.0811890662, -0.0289580598, 0.0275824945, -0.0396562777, -0.0852629915, -0.034020327, 0.0111828512, -0.0389192104, 0.0108002126, 0.0136715826, -0.022324264, 0.0119245518, -0.0309615824, 0.000503282819, -0.101692297, 0.084280014, 0.0142116807, 0.0506727621, -0.022713935, 0.023602955, 0.0232590586, 0.0195973329, 0.0167151485, 0.0682225227, 0.0266953968, 0.0251404885, 0.00857758336, 0.00354696298, -0.0196637604, -0.0516892746, 0.00124004146, 0.0656451061, -0.0365472585, 0.0228751823, 0.0167074464, -0.0278516281, 0.0135782296, -0.0153833777, 0.0225906745, -0.0627038255, 0.0155224968, 0.0106077492, 0.00637715776, -0.0423678458, 0.0323100723, -0.0207919665, -0.017127933, -0.0253154058, -0.0499628708, 0.00927249156, -0.0262260642, 0.0642394125, 0.0744401291, -0.0185754392, 0.0261703525, 0.0450614803, 0.0102117192, 0.0496626832, -0.0406621955, -0.067477718, 0.0290159862, 0.0255232845, 0.0134262722, 0.044429712, 0.0341479816, -0.00634826208, -0.0096984664, -0.00826020166, 0.00269745826, -0.0366808921, -0.0306828022, -0.0485879146, 0.0536868088, -0.0294536, -0.0128914621, 0.0433964, 0.0679328516, 0.0419851691, 0.0319131203, 0.00572495162, -0.0593418553, 0.0419779979, -0.0180472396, 0.00308148563, 0.00936114509, -0.0266858768, 0.0844824836, 0.0244817305, 0.0716681406, 0.0213922095, -0.0433050841, -0.0424965285, 0.0265246071, -0.0363354534, 0.0470387787, 0.000998046598, -0.0301819947, 0.0359553248, -0.0187455229, 0.0433252044, 0.0268803276, 0.0370646417, -0.00442877132, -0.0307491217, -0.0744164288, -0.0178091843, -0.029316565, -0.0376734249, 0.00571612595, 0.0355305299, -0.0533956736, -0.0109693352, 0.0598264076, 0.000369663321, 0.0284329075, 0.0120660514, 0.0348922275, 0.00871871691, 0.0282395147, -0.0416069292, 0.0244780369, 0.00386472698, -0.0184448957, -0.0145646576, -0.0352934636, 0.0900332481, 0.0564055, -0.0358369425, -0.0200957302, 0.0322364531, 0.0221990347, -0.00514403824, 0.0458474904, -0.014784744, -0.0212131087, -0.0122775547, 0.0241368338, -0.0168206971, -0.00778258266, -0.0459511653, 0.00616869237, 0.0615480468, -0.0074183871, 0.0391657539, 0.0528129786, -0.00534595549, -0.0261527337, -0.0172083303, -0.0693547428, -0.0162504073, 0.00845262408, -0.00221800245, 0.0536680743, 0.0185088869, -0.0469287969, -0.0506579541, -0.0501829572, 0.0126474788, 0.0580951981, 0.0700035095, -0.053377416, 0.0645361319, -0.00773815531, 0.0212340914, 0.00585397938, -0.102002174, -0.0498093665, -0.0554171056, 0.0147853317, 0.0176948421, 0.0368236303, -0.0138630709, -0.072285831, -0.00532582076, -0.00175052474, -0.00947664, 0.00799054094, 0.0206846874, -0.0538249798, -0.0278979745, 0.0184914954, 0.0266139638, 0.0263833571, -0.0496483222, 0.00543869939, -0.031254705, -0.010092807, -0.0500179753, -0.0152427312, 0.0263205711, 0.0117528271, 0.0439845324, -0.0525217876, -0.03516661, 0.0448944755, 0.0034636904, -0.0155304288, 0.0427241698, 0.0190941375, 0.0407500938, 0.0226688422, -0.0046789879, 0.0187534336, -0.00250133313, 0.00900592282, -0.016800873, 0.00478254864, -0.0479324758, -0.253520519, 0.0107478704, -0.0512049198, -0.0195405409, 0.0342401527, -0.0287980922, 0.0280464236, -0.046467524, 0.0218871962, -0.0122935651, -0.0249388702, -0.0166860484, 0.0496161, 0.011088918, 0.0384330861, 0.062357977, 0.0217694063, -0.0700365156, 0.0343188681, 0.0511013195, 0.0323647521, -0.0394730829, -0.0569268204, 0.0474758, -0.0229785871, -0.00731324684, -0.0350727737, 0.014982285, -0.0569754615, -0.0199674554, 0.00962260459, -0.0242878292, -0.0431679636, 0.00397172244, -0.0119334841, -0.0260926411, 0.0235477854, 0.0106744841, -0.0104889618, -0.0178366471, -0.00690067699, 0.0129196206, -0.000921441242, -0.0280241743, 0.0431471765, 0.0110156275, -0.103730537, -0.0286004413, -0.028531339, 0.0670812428, 0.0036065944, -0.0764285922, 0.018834604, 0.0151641285, 0.0150765199, -0.0497657545, 0.0196740255, 0.0349892043, -0.0591136068, -0.0304978862, 0.00476647168, -0.0447272547, -0.0647027045, -0.0672481656, -0.00630577933, -0.0423053168, -0.0335824639, -0.055639185, 0.02807655, 0.0637785718, -0.0469817594, 0.00739143183, -0.0193093065, -0.0921096, -0.0281407293, -0.0115912566, 0.0165349375, 0.0422014929, -0.000547757372, 0.0266972296, -0.00847821869, -0.0379833803, 0.0393882245, -0.026372971, -0.0034066, -0.0308541264, 0.0200982336, -0.0319968797, -0.0170503929, -0.0414161794, 0.0364418328, -0.0332740061, -0.0121350586, 0.0439868122, 0.0120673673, 0.00697595, -0.019349359, -0.0295975879, 0.0366832502, -0.0243794248, 0.0126907583, 0.01668825, 0.0380963497, -0.0682394281, -0.0215218645, 0.0130894128, -0.0273811761, -0.0317153223, 0.0564470738, -0.0335089378, 0.00517373765, -0.00734680612, 0.00757663138, -0.058145415, 0.0259873848, -0.0462741517, 0.0493419915, 0.0471077636, 0.00437180931, -0.0532340147, 0.0222016033, 0.0424155183, -0.0357880034, -0.018135123, -0.0300357, -0.0150667317, 0.0640106574, 0.00470877625, 0.0188447908, 0.0671414286, -0.0463650823, 0.00705033075, -0.0232379027, -0.0328128077, 0.0286921989, 0.00996291637, -0.013246893, 0.00359682972, -0.0167193022, -0.0211458039, 0.0116351629, 0.00760885747, 0.00941441115, 0.0407843627, 0.0535937808, 0.0214633103, -0.00387271494, -0.00678248564, -0.0553700551, 0.0400775783, -0.00408225739, 0.0116911391, 0.00696279481, -0.0182191655, 0.0391702652, 0.0186691284, 0.0820955336, -0.0139377853, -0.03856197, -0.0495314859, 0.00407974049, 0.0152086206, -0.0192280058, 0.0392437726, -0.0117436443, 0.0686326474, -0.025704354, -0.0199395698, -0.0294636395, 0.000439060677, 0.0622239821, -0.0732533187, 0.0108121354, -0.0102201328, -0.0210625101, 0.000708695443, 0.0140675455, 0.0371041857, 0.00098699017, 0.00745838741, 0.0101016508, -0.0487191342, -0.0474429578, -0.0175589658, 0.0440259613, 0.0246375, -0.00639709178, -0.0233027562, -0.03201814, -0.0158567261, -0.0334052481, 0.0211238656, 0.0234568026, -0.0209065508, -0.0165107194, -0.0302346479, 0.0367188081, 0.0215891022, 0.0229533929, -0.0094852373, -0.0462091714, -0.00199621893, -0.0197748672, 0.0102509661, 0.0107649621, -0.0894304, 0.0258498602, 0.00617043301, -0.0270467922, -0.014316747, -0.0337005816, -0.0603850186, -0.0346719846, -0.0657659173, -0.0173518378, -0.0242826194, 0.0125950128, 0.00801153, 0.00145238219, -0.026217008, 0.05280618, -0.0204931349, 0.0191608425, 0.00205226336, -0.00818116777, 0.0405019931, 0.0174130704, -0.00974785, 0.0168567263, -0.0225473754, 0.0320293754, -0.0158668589, 0.028262224, 0.0273962747, 0.0122663742, 0.00594060542, -0.0644901842, 0.00122162269, 0.0269265, 0.030475935, -0.0233597327, -0.00190053391, -0.0233855192, 0.0108996751, 0.0163960848, 0.0136835016, 0.02035808, -0.0245353878, -0.0292793922, 0.0559382476, 0.00631269207, 0.0425811894, -0.00723134261, -0.0103278207, 0.0413109586, -0.00832662825, -0.0345219858, 0.0179503467, -0.0501262546, 0.0523872375, 0.00998103339, 0.028856853, -0.0295615513, 0.0606655031, 0.0510687456, 0.0196845829, -0.00976551231, -0.0393294618, 0.0282408837, -0.0492868349, 0.00808460638, -0.0161801819, -0.0531141572, 0.0394831337, 0.0238358229, -0.0539528355, -0.02156578, -0.0279104, 0.0579732768, -0.0590937473, -0.0581894, 0.0253783651, -0.000068431058, 0.012574954, 0.0207560789, -0.0413036831, -0.0236150809, -0.0026032906, -0.0467359386, 0.0331686325, -0.0131738549, 0.0760637596, -0.07420744, 0.0352159441, -0.0120826755, 0.0174544659, 0.0303356685, 0.0306852013, -0.004424199, 0.00494159665, 0.00510052079, 0.0326812305, 0.0450178, 0.00815424, -0.0325180553, 0.0669485778, 0.0293419044, -0.0340898521, -0.00180768943, 0.0112757022, -0.00842750166, -0.0349877216, 0.0723765641, 0.0265912656, -0.0215734, -0.00890582148, -0.00491688773, -0.0448312536, 0.0482120141, 0.0468561351, 0.0457184277, -0.0373374, 0.0692759231, 0.0145565132, 0.00772258127, 0.0462618209, 0.0334438831, -0.0489053465, 0.00306069176, 0.0674801, 0.0410525203, 0.000990810222, 0.030959107, 0.00741565181, -0.0278983153, -0.0486306921, -0.00669058412, 0.00996129774, -0.00194495532, 0.0153230987, -0.0371844545, 0.0703322291, 0.0322448686, 0.0441237837, -0.00596634112, 0.0347016379, 0.0100488784, -0.00740969181, 0.00475488, 0.0203719325, -0.0224476047, 0.0300235301, 0.0103210965, -0.00950132776, 0.00874515902, 0.0263449177, 0.0476431474, 0.0118402522, -0.0400019102, 0.012845817, -0.00840143766, 0.0183596201, 0.0736832768, -0.0371559411, -0.0460283831, -0.00641983422, 0.0240556952, -0.0405823104, -0.0140960524, 0.0380607583, -0.0195966102, -0.00682373438, -0.0401344076, 0.003338143, -0.0210006256, 0.0493971147, 0.0621517077, -0.000617028214, -0.00731636258, 0.075070776, 0.0219628569, -0.0465089753, -0.0422397703, -0.0652738512, -0.00154179789, -0.0620897375, -0.062667273, -0.0453648642, 0.0407809578, -0.0238504186, -0.0290589575, -0.0269197505, -0.0167245381, 0.00433910824, -0.0650331676, 0.0219133161, 0.031243965, 0.0638766885, -0.00604520598, 0.00833379664, 0.0356419124, 0.020760024, -0.0353031047, 0.0699770749, 0.0167094767, 0.0445623621, -0.0171644092, 0.00867044739, -0.0592420138, 0.0393939167, -0.00743607758, 0.000246652984, -0.0518115237, 0.0260321517, 0.0450726, -0.0030268156, 0.00572690554, 0.0156906024, 0.0317867771, -0.0413029641, -0.0370030068, 0.0164657421, 0.0215885956, 0.0190359764, -0.0219113547, 0.0323513821, 0.0663962364, 0.0303047057, -0.0474460907, 0.0150765171, 0.004191685, -0.00843179412, -0.00238989689, -0.0359322093, -0.0223644525, -0.0097963931, 0.00086767826, 0.0260901731, -0.0331486687, -0.036550384, -0.0121632917, 0.00960545801, -0.00391413877, 0.032406427, -0.0222168118, 0.00545019144, -0.0025092815, -0.00219334802, -0.117667004, 0.0238922536, 0.0265307818, 0.0290346127, 0.0157101266, -0.0443665236, 0.0268904902, -0.0397881418, 0.0375558, 0.0361577645, -0.0114037013, 0.0293435045]
+    # Shared prime-node embedding (copied so callers can't mutate the cache)
+    values: List[float] = list(_PRIME_VALUES)
 
 
     # NOTE: This file_path is informational metadata (doesn't have to exist),
@@ -43,7 +114,7 @@ def get_prime_node(train_type: str) -> Dict:
     )
 
     # This is the JSON stored in _node_content (LlamaIndex-style TextNode serialization)
-    node_obj = {
+    node_obj: Dict[str, Any] = {
         "id_": record_id,
         "embedding": None,
         "metadata": {
@@ -102,7 +173,7 @@ def get_prime_node(train_type: str) -> Dict:
         "class_name": "TextNode",
     }
 
-    metadata = {
+    metadata: Dict[str, Any] = {
         "_node_content": json.dumps(node_obj, ensure_ascii=False),
         "_node_type": "TextNode",
         "creation_date": "2026-01-06",
@@ -124,7 +195,7 @@ def get_prime_node(train_type: str) -> Dict:
     return {"id": record_id, "values": values, "metadata": metadata}
 
 
-def get_prime_nodes() -> List[Dict]:
+def get_prime_nodes() -> List[Dict[str, Any]]:
     """Return all Prime nodes for one-time upsert."""
     return [get_prime_node("pharma"), get_prime_node("herbal"), get_prime_node("agrovet")]
 
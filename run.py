@@ -1,8 +1,11 @@
 # run.py
+import logging
+
 from waitress import serve
 from app import create_app
 
 app = create_app()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     serve(app, host="0.0.0.0", port=5000)
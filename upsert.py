@@ -1,24 +1,65 @@
+import functools
+import hashlib
 import json
+import logging
+import os
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from typing import List, Optional, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# One pair of JSON entry points for the module; the orjson/stdlib decision
+# happens at import time instead of inside every call site.
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+else:
+    _loads = json.loads
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
 from llama_index.core import VectorStoreIndex
 from llama_index.core import Settings
 
 from dataloader import load_documents
 from app_config import init_settings_and_storage
 from ocr import run_ocr
+from prime_node import get_prime_node
 
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes
+    fcntl = None
+    import msvcrt
+
+
+logger = logging.getLogger(__name__)
 
 ALLOWED_TYPES = {"pharma", "herbal", "agrovet", "other"}
 
+# common casing variants resolved to (normalized, capitalized) in one dict
+# hit; anything unusual falls back to strip/lower once and retries
+_TYPE_TABLE = {}
+for _t in ALLOWED_TYPES:
+    for _v in (_t, _t.upper(), _t.capitalize()):
+        _TYPE_TABLE[_v] = (_t, _t.capitalize())
+
 
 def _normalize_type(t: Optional[str]) -> Optional[str]:
     if not t:
         return None
-    t = str(t).strip().lower()
-    return t if t in ALLOWED_TYPES else None
+    entry = _TYPE_TABLE.get(t) or _TYPE_TABLE.get(str(t).strip().lower())
+    return entry[0] if entry else None
 
 
 def _iter_types(train_type: Optional[str]) -> List[str]:
@@ -31,96 +72,205 @@ def _iter_types(train_type: Optional[str]) -> List[str]:
 
 
 def _cap_type(t: str) -> str:
-    return t.strip().lower().capitalize()
+    entry = _TYPE_TABLE.get(t) or _TYPE_TABLE.get(t.strip().lower())
+    return entry[1] if entry else t.strip().lower().capitalize()
 
 
 def _prime_node_id(train_type: str) -> str:
     return f"Prime_Node_{_cap_type(train_type)}"
 
 
-def update_list(storage_context, documents, train_type: str) -> None:
+# Pinecone caps a vector's metadata around 40 KB, and every prime-node update
+# re-uploads the whole blob. The product list is therefore spread over chunk
+# records (Prime_Node_Pharma, Prime_Node_Pharma_1, ...), each capped so a
+# single update touches a bounded payload no matter how the catalog grows.
+PRIME_TEXT_CAP = 18_000
+PRIME_MAX_CHUNKS = 8
+
+
+def _prime_node_ids_for_type(t: str, count: int = PRIME_MAX_CHUNKS) -> List[str]:
+    """Base id plus the overflow chunk ids probed on each update."""
+    base = _prime_node_id(t)
+    return [base] + [f"{base}_{i}" for i in range(1, count + 1)]
+
+
+def _extract_items_from_docs(documents) -> List[str]:
+    """Collect product names (filename stems) from the documents, deduped
+    case-insensitively; multiple chunks of one PDF yield one item."""
+    seen: dict = {}
+    for d in documents:
+        fn = d.metadata.get("file_name")
+        if fn:
+            stem = Path(fn).stem.strip()
+            if stem:
+                seen.setdefault(stem.lower(), stem)
+    return list(seen.values())
+
+
+# one-shot whitespace normalization for the comma list; translate maps the
+# characters in a single C pass instead of chained str.replace copies
+_LIST_WS_TRANS = str.maketrans("\n\r\t", "   ")
+
+
+def update_list(storage_context, documents, train_type: Optional[str] = None) -> None:
     """
-    Update exactly ONE prime node (for the given train_type) using the documents passed in.
+    Update the prime node(s) covered by the documents passed in.
+
+    With train_type given, exactly that type's node is updated (the original
+    contract). With train_type=None the documents are grouped by their
+    product_type metadata and every affected node is updated. All prime nodes
+    are fetched in ONE round-trip and the per-type updates run concurrently;
+    network latency dominates this function, not the merging.
     """
     vector_store = storage_context.vector_store
     pinecone_index = vector_store._pinecone_index
     namespace = vector_store.namespace
 
-    t = _normalize_type(train_type)
-    if not t:
-        raise ValueError(f"Invalid train_type for update_list: {train_type}")
-    
-    # If train type is "Other" then no node needs to be updated
-    if t == "other":
-        return
-
-    node_id = _prime_node_id(t)
+    # group documents by type ("other" has no prime node)
+    docs_by_type: dict = {}
+    if train_type is not None:
+        t = _normalize_type(train_type)
+        if not t:
+            raise ValueError(f"Invalid train_type for update_list: {train_type}")
+        if t != "other":
+            docs_by_type[t] = documents
+    else:
+        # classification runs once per document; hit the type table directly
+        # and hoist the setdefault instead of paying both per iteration
+        tbl_get = _TYPE_TABLE.get
+        grp = docs_by_type.setdefault
+        for d in documents:
+            pt = d.metadata.get("product_type")
+            entry = tbl_get(pt) if pt else None
+            if entry is None and pt:
+                entry = tbl_get(str(pt).strip().lower())
+            if entry is not None and entry[0] != "other":
+                grp(entry[0], []).append(d)
 
     # 1) collect product names from filenames (remove .pdf)
-    new_items = [
-        Path(d.metadata.get("file_name")).stem
-        for d in documents
-        if d.metadata.get("file_name")
-    ]
-    new_items = [x.strip() for x in new_items if x and x.strip()]
-    if not new_items:
+    items_by_type = {}
+    for dt, docs in docs_by_type.items():
+        new_items = _extract_items_from_docs(docs)
+        if new_items:
+            items_by_type[dt] = new_items
+    if not items_by_type:
         return
 
-    # 2) fetch existing node
-    res = pinecone_index.fetch(ids=[node_id], namespace=namespace)
-    if node_id not in getattr(res, "vectors", {}):
-        raise ValueError(f"Node ID not found in Pinecone: {node_id}")
-
-    vec = res.vectors[node_id]
-    meta = getattr(vec, "metadata", None) or vec.get("metadata", {}) or {}
-
-    raw = meta.get("_node_content")
-    if not raw:
-        raise ValueError(f"Missing _node_content for node: {node_id}")
-
-    # 3) parse node JSON
-    node_obj = json.loads(raw)
-    text = node_obj.get("text", "") or ""
-
-    # 4) split existing comma-separated items
-    existing_items = [
-        x.strip()
-        for x in text.replace("\n", " ").split(",")
-        if x.strip()
-    ]
-
-    # dedupe new_items in the same run (prevents Nexum,Nexum,Nexum)
-    new_items_unique: List[str] = []
-    seen_new = set()
-    for it in new_items:
-        k = it.lower()
-        if k not in seen_new:
-            seen_new.add(k)
-            new_items_unique.append(it)
-
-    # 5) merge (case-insensitive, keep original order)
-    seen = {x.lower(): x for x in existing_items}
-    for item in new_items_unique:
-        if item.lower() not in seen:
-            seen[item.lower()] = item
-
-    merged_items = list(seen.values())
-
-    # 6) rebuild text exactly as comma-separated
-    node_obj["text"] = ", ".join(merged_items)
-
-    # 7) write back
-    pinecone_index.update(
-        id=node_id,
-        set_metadata={"_node_content": json.dumps(node_obj, ensure_ascii=False)},
-        namespace=namespace,
-    )
+    # 2) fetch every affected prime node (base + overflow chunks) in one round-trip
+    ids = [cid for dt in items_by_type for cid in _prime_node_ids_for_type(dt)]
+    res = pinecone_index.fetch(ids=ids, namespace=namespace)
+    vectors = getattr(res, "vectors", {}) or {}
+
+    def _update_one(dt: str) -> None:
+        chunk_ids = _prime_node_ids_for_type(dt)
+        if chunk_ids[0] not in vectors:
+            raise ValueError(f"Node ID not found in Pinecone: {chunk_ids[0]}")
+
+        # 3) parse every existing chunk; dedupe is across all of them
+        chunks = []
+        existing_lower = set()
+        for cid in chunk_ids:
+            vec = vectors.get(cid)
+            if vec is None:
+                break  # chunk ids are allocated contiguously
+            meta = getattr(vec, "metadata", None) or vec.get("metadata", {}) or {}
+            raw = meta.get("_node_content")
+            if not raw:
+                raise ValueError(f"Missing _node_content for node: {cid}")
+            node_obj = _loads(raw)
+            chunks.append((cid, node_obj))
+            for part in (node_obj.get("text", "") or "").translate(_LIST_WS_TRANS).split(","):
+                s = part.strip()
+                if s:
+                    existing_lower.add(s.lower())
+
+        # 4) keep only the genuinely new names; when nothing is new (the
+        # common case on re-ingests) the write is skipped entirely
+        truly_new: List[str] = []
+        for item in items_by_type[dt]:
+            k = item.lower()
+            if k not in existing_lower:
+                existing_lower.add(k)
+                truly_new.append(item)
+        if not truly_new:
+            return
+
+        # 5-7) append into the newest chunk up to the cap; spill the rest
+        # into freshly created chunk records (only the touched chunks are
+        # re-uploaded, never the whole catalog)
+        target_id, target_obj = chunks[-1]
+        next_idx = len(chunks)  # the base node counts as chunk 0
+        is_new_chunk = False
+        pending = truly_new
+        while pending:
+            text = target_obj.get("text", "") or ""
+            size = len(text)
+            taken: List[str] = []
+            while pending:
+                extra = len(pending[0]) + (2 if size else 0)
+                if size and size + extra > PRIME_TEXT_CAP:
+                    break
+                size += extra
+                taken.append(pending.pop(0))
+            if taken:
+                joined = ", ".join(taken)
+                target_obj["text"] = f"{text}, {joined}" if text else joined
+
+                if is_new_chunk:
+                    # model the new record on the canonical prime node
+                    rec = get_prime_node(dt)
+                    rec["id"] = target_id
+                    new_obj = _loads(rec["metadata"]["_node_content"])
+                    new_obj["id_"] = target_id
+                    new_obj["text"] = target_obj["text"]
+                    rec["metadata"]["_node_content"] = _dumps(new_obj)
+                    rec["metadata"]["doc_id"] = target_id
+                    rec["metadata"]["document_id"] = target_id
+                    rec["metadata"]["ref_doc_id"] = target_id
+                    pinecone_index.upsert(vectors=[rec], namespace=namespace)
+                else:
+                    pinecone_index.update(
+                        id=target_id,
+                        set_metadata={"_node_content": _dumps(target_obj)},
+                        namespace=namespace,
+                    )
+            # when nothing fit (the newest chunk was already at the cap)
+            # there is no write to make; fall through to the next chunk
+
+            if not pending:
+                break
+            if next_idx > PRIME_MAX_CHUNKS:
+                # never allocate ids the fetch in step 2 won't probe: names
+                # stored past the horizon would be invisible to the dedupe
+                # and re-ingested as "new" forever
+                logger.warning(
+                    "prime node %s is full (%d overflow chunks); dropping %d "
+                    "name(s) — raise PRIME_MAX_CHUNKS to grow the catalog",
+                    chunk_ids[0], PRIME_MAX_CHUNKS, len(pending),
+                )
+                break
+            target_id = f"{chunk_ids[0]}_{next_idx}"
+            next_idx += 1
+            target_obj = {"text": ""}
+            is_new_chunk = True
+
+    types = list(items_by_type)
+    if len(types) == 1:
+        _update_one(types[0])
+        return
+
+    with ThreadPoolExecutor(max_workers=len(types)) as pool:
+        futures = {pool.submit(_update_one, dt): dt for dt in types}
+        for fut in as_completed(futures):
+            dt = futures[fut]
+            try:
+                fut.result()
+            except Exception as e:
+                logger.warning("prime-node update failed for %s: %s", dt, e)
 
 
 def cleanup_train_data(train_type: str | None = None) -> None:
     base = Path(__file__).resolve().parent / "data" / "train_data"
-    if not base.exists():
-        return
 
     train_type = _normalize_type(train_type)
 
@@ -131,53 +281,194 @@ def cleanup_train_data(train_type: str | None = None) -> None:
             target.mkdir(parents=True, exist_ok=True)
         return
 
-    for item in base.iterdir():
-        if item.is_dir():
-            shutil.rmtree(item)
-        else:
-            item.unlink(missing_ok=True)
+    # scandir avoids a stat per entry; the recursive rmtree walks are
+    # I/O bound, so fan them out instead of unlinking one tree at a time
+    try:
+        it = os.scandir(base)
+    except FileNotFoundError:
+        return
+    dirs: List[str] = []
+    with it:
+        for entry in it:
+            if entry.is_dir():
+                dirs.append(entry.path)
+            else:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+    if not dirs:
+        return
+    with ThreadPoolExecutor(max_workers=min(8, len(dirs))) as pool:
+        for fut in [pool.submit(shutil.rmtree, d) for d in dirs]:
+            fut.result()
 
 
 
-def build_index(train_type: str | None = None) -> Optional[Tuple[VectorStoreIndex, int]]:
-    types_to_run = _iter_types(train_type)
+# Manifest of already-embedded documents. Node ids in Pinecone are
+# parser-generated UUIDs, so the index can't be asked "is this PDF already
+# in?"; a local hash manifest keyed by file name + type can.
+MANIFEST_PATH = Path(__file__).resolve().parent / "save" / "ingested_docs.json"
+_manifest_lock = threading.Lock()
 
-    print(f"Building index for types: {types_to_run}")
 
-    storage_context = init_settings_and_storage()
+def _doc_key(d) -> str:
+    raw = f"{d.metadata.get('file_name', '')}|{d.metadata.get('product_type', '')}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
 
-    total_chunks = 0
-    last_index: Optional[VectorStoreIndex] = None
 
-    for t in types_to_run:
-        run_ocr(train_type=t)
+def _load_manifest() -> set:
+    try:
+        with open(MANIFEST_PATH, "rb") as f:
+            data = _loads(f.read())
+        return set(data) if isinstance(data, list) else set()
+    except Exception:
+        return set()
 
-        documents = load_documents(train_type=t)
-        if not documents:
-            print(f"[{t}] No documents found; skipping.")
-            cleanup_train_data(train_type=t)
-            continue
 
-        # stamp type
-        for d in documents:
-            d.metadata["product_type"] = t
+def _save_manifest(keys: set) -> None:
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    data = _dumps(sorted(keys)).encode("utf-8")
+    tmp = MANIFEST_PATH.with_name(MANIFEST_PATH.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+@functools.lru_cache(maxsize=1)
+def _cached_storage_context():
+    """One storage context per process. app_config already caches the Pinecone
+    client/index handle; this also skips re-instantiating the embedding model
+    and vector store when a long-running worker builds many indexes."""
+    return init_settings_and_storage()
+
 
-        # embed this batch
-        last_index = VectorStoreIndex.from_documents(
-            documents,
-            storage_context=storage_context,
-            show_progress=True,
-        )
+# Lock files live in save/ with the other persistent artifacts, NOT in
+# data/train_data: cleanup_train_data wipes that tree, and deleting a held
+# lock file would let the next locker grab a fresh inode and void the lock.
+_LOCK_DIR = Path(__file__).resolve().parent / "save"
 
-        nodes = Settings.node_parser.get_nodes_from_documents(documents)
-        total_chunks += len(nodes)
 
-        update_list(storage_context, documents, train_type=t)
+@contextmanager
+def _train_lock(train_type: Optional[str]):
+    """Exclusive per-type lock over the OCR -> embed -> cleanup pipeline.
+
+    Two concurrent ingests of the same type (API upload racing the crawler)
+    would otherwise let cleanup_train_data wipe files the other run is still
+    consuming, silently producing an empty index and redoing the OCR. The
+    lock works across processes (flock / msvcrt) and across threads within
+    one process (each entry opens its own descriptor).
+    """
+    _LOCK_DIR.mkdir(parents=True, exist_ok=True)
+    f = open(_LOCK_DIR / f".lock_{train_type or 'all'}", "w")
+    try:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            f.close()
+
+
+def _build_index_for_type(storage_context, t: str) -> Optional[Tuple[VectorStoreIndex, int]]:
+    """Run the OCR -> load -> embed -> prime-node pipeline for one type."""
+    with _train_lock(t):
+        return _build_index_for_type_locked(storage_context, t)
+
+
+def _build_index_for_type_locked(storage_context, t: str) -> Optional[Tuple[VectorStoreIndex, int]]:
+    run_ocr(train_type=t)
+
+    documents = load_documents(train_type=t)
+    if not documents:
+        logger.info("[%s] No documents found; skipping.", t)
         cleanup_train_data(train_type=t)
+        return None
+
+    # stamp type
+    for d in documents:
+        d.metadata["product_type"] = t
+
+    # drop documents embedded in a previous run; embedding is the most
+    # expensive step after OCR and re-runs over crawled data are common
+    with _manifest_lock:
+        manifest = _load_manifest()
+    fresh = [d for d in documents if _doc_key(d) not in manifest]
+    if len(fresh) < len(documents):
+        logger.info("[%s] Skipping %d already-embedded document(s).", t, len(documents) - len(fresh))
+    if not fresh:
+        cleanup_train_data(train_type=t)
+        return None
+    documents = fresh
+
+    # parse once, then embed the nodes directly (from_documents would
+    # re-run the node parser internally just to get the same nodes)
+    nodes = Settings.node_parser.get_nodes_from_documents(documents)
+    # use_async lets the vector-store writer push finished batches to
+    # Pinecone while the embedder works on the next ones
+    index = VectorStoreIndex(
+        nodes,
+        storage_context=storage_context,
+        use_async=True,
+        show_progress=True,
+    )
+
+    update_list(storage_context, documents, train_type=t)
+
+    # record the embedded documents only after the index build succeeded
+    with _manifest_lock:
+        manifest = _load_manifest()
+        manifest.update(_doc_key(d) for d in documents)
+        _save_manifest(manifest)
+
+    cleanup_train_data(train_type=t)
+
+    logger.info("[%s] Done. Chunks added: %d", t, len(nodes))
+    return index, len(nodes)
+
+
+def build_index(train_type: str | None = None) -> Optional[Tuple[VectorStoreIndex, int]]:
+    types_to_run = _iter_types(train_type)
+
+    logger.info("Building index for types: %s", types_to_run)
+
+    storage_context = _cached_storage_context()
+
+    total_chunks = 0
+    last_index: Optional[VectorStoreIndex] = None
 
-        print(f"[{t}] Done. Chunks added: {len(nodes)}")
+    if len(types_to_run) == 1:
+        result = _build_index_for_type(storage_context, types_to_run[0])
+        if result is not None:
+            last_index, total_chunks = result
+    else:
+        # Types are independent (separate folders, disjoint prime nodes), so
+        # run them concurrently. Threads are enough: OCR is network-bound and
+        # torch releases the GIL while embedding.
+        with ThreadPoolExecutor(max_workers=len(types_to_run)) as pool:
+            futures = {
+                pool.submit(_build_index_for_type, storage_context, t): t
+                for t in types_to_run
+            }
+            for fut in as_completed(futures):
+                t = futures[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    logger.warning("[%s] build failed: %s", t, e)
+                    continue
+                if result is not None:
+                    last_index, chunks = result
+                    total_chunks += chunks
 
-    
     if last_index is None:
         return None
 
@@ -186,4 +477,5 @@ def build_index(train_type: str | None = None) -> Optional[Tuple[VectorStoreInde
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     build_index()